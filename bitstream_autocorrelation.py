@@ -23,8 +23,9 @@ Genes:
 These genes can be adjusted automatically by the GA to minimize estimation error.
 
 Fitness function:
-- 1 / (1.0 + total squared error across multiple test samples to penalize outliers)
-- A maximum allowed time could also be considered
+- Worst (max) error across multiple test samples, so a single outlier is enough to reject a configuration
+- The cost of each configuration (measured latency or number of XOR operations) is optimized alongside the error,
+  giving an accuracy/cost Pareto front (see bitstream_autocorrelation_genetic_tuning.py)
 - The goal is to find gene settings that result in the smallest difference between estimated and true frequency
 
 To evaluate the fitness:
@@ -3,14 +3,23 @@ import numpy as np
 import os
 import pygad  # For the genetic algorithm
 import math
+import time
 from matplotlib import pyplot as plt
 
 # Folder containing the input .wav files
 folder_path = "plucks"
 
+# How the cost of a configuration is measured:
+# - "model": deterministic cost model, number of XOR operations of the autocorrelation (leng * leng)
+# - "measured": measured latency of the estimator (median over the test files, in seconds)
+cost_mode = "model"
+
+# Accuracy the chosen configuration has to meet on every test file (Hz)
+max_allowed_error = 2.0
+
 
 # ----------------- Core Estimator -----------------
-def estimate_freq_via_xor_trigger(file_path, low_thresh=-0.1, high_thresh=0.1, num_samples=1000, samples_to_skip=20):
+def load_wav(file_path):
     with wave.open(file_path, 'rb') as wf:
         n_channels = wf.getnchannels()
         sampwidth = wf.getsampwidth()
@@ -24,6 +33,16 @@ def estimate_freq_via_xor_trigger(file_path, low_thresh=-0.1, high_thresh=0.1, n
     if n_channels > 1:
         raw_audio = raw_audio[::n_channels]
 
+    return raw_audio, framerate
+
+
+def estimate_freq_via_xor_trigger(file_path, low_thresh=-0.1, high_thresh=0.1, num_samples=1000, samples_to_skip=20):
+    raw_audio, framerate = load_wav(file_path)
+    return estimate_freq_from_samples(raw_audio, framerate, low_thresh, high_thresh, num_samples, samples_to_skip)
+
+
+def estimate_freq_from_samples(raw_audio, framerate, low_thresh=-0.1, high_thresh=0.1, num_samples=1000,
+                               samples_to_skip=20):
     raw_audio = raw_audio[:num_samples]
     audio = raw_audio / np.max(np.abs(raw_audio))
 
@@ -64,8 +83,18 @@ def estimate_freq_via_xor_trigger(file_path, low_thresh=-0.1, high_thresh=0.1, n
     return estimated_frequency
 
 
+# ----------------- Cost Model -----------------
+def autocorrelation_cost(num_samples):
+    """
+    Deterministic cost of one estimate: number of XOR operations of the autocorrelation.
+    leng = num_samples / 2 bits are compared for each of the leng lags.
+    """
+    leng = math.floor(num_samples / 2)
+    return leng * leng
+
+
 # ----------------- Fitness Function -----------------
-# Pre-load the dataset once so GA runs faster
+# Pre-load the dataset once so GA runs faster (and file loading is not part of the measured latency)
 test_files = []
 true_freqs = []
 for filename in os.listdir(folder_path):
@@ -75,30 +104,70 @@ for filename in os.listdir(folder_path):
         try:
             freq_part = filename.split("_")[2]  # get true frequency from the file's name
             true_freq = float(freq_part.replace("Hz", ""))
+            raw_audio, framerate = load_wav(input_path)
             true_freqs.append(true_freq)
-            test_files.append((input_path, true_freq))
+            test_files.append((input_path, true_freq, raw_audio, framerate))
         except Exception as e:
-            print("Error encountered: {e}")
+            print(f"Error encountered: {e}")
             continue
 
+# Every evaluated configuration: (low_thresh, high_thresh, samples_to_skip, num_samples) -> (total squared error, max error, cost)
+evaluated = {}
 
-def fitness_func(ga_instance, solution, solution_idx):
+
+def evaluate_solution(solution):
     low_thresh, high_thresh, samples_to_skip, num_samples = solution
+    key = (float(low_thresh), float(high_thresh), int(samples_to_skip), int(num_samples))
+    if key in evaluated:
+        return evaluated[key]
 
     total_error = 0.0
-
-    for file_path, true_freq in test_files:
-        est_freq = estimate_freq_via_xor_trigger(
-            file_path,
+    max_error = 0.0
+    latencies = []
+
+    for file_path, true_freq, raw_audio, framerate in test_files:
+        start_time = time.perf_counter()
+        est_freq = estimate_freq_from_samples(
+            raw_audio,
+            framerate,
             low_thresh=low_thresh,
             high_thresh=high_thresh,
             samples_to_skip=int(samples_to_skip),
             num_samples=int(num_samples)
         )
+        latencies.append(time.perf_counter() - start_time)
         total_error += (est_freq - true_freq) ** 2  # Use square error to punish outliers
+        max_error = max(max_error, abs(est_freq - true_freq))
+
+    if cost_mode == "measured":
+        cost = float(np.median(latencies))
+    else:
+        cost = autocorrelation_cost(int(num_samples))
+
+    evaluated[key] = (total_error, max_error, cost)
+    return evaluated[key]
+
+
+def fitness_func(ga_instance, solution, solution_idx):
+    _, max_error, cost = evaluate_solution(solution)
 
-    fitness = 1.0 / (1.0 + total_error)  # Lower error = higher fitness
-    return fitness
+    # Two objectives, both maximized by NSGA-II: the (negated) worst error over the test files,
+    # which is also what the final configuration is chosen on, and the (negated) cost
+    return [-max_error, -cost]
+
+
+def pareto_front(points):
+    """
+    Returns the keys of the non-dominated configurations, minimizing (max error, cost), sorted by cost.
+    Configurations tied on both objectives are represented once (the one with the lowest total squared error).
+    """
+    front = []
+    lowest_max_error = float("inf")
+    for key in sorted(points, key=lambda k: (points[k][2], points[k][1], points[k][0])):
+        if points[key][1] < lowest_max_error:
+            front.append(key)
+            lowest_max_error = points[key][1]
+    return front
 
 
 # ----------------- PyGAD Setup -----------------
@@ -110,6 +179,7 @@ gene_space = [
     {'low': 400,  'high': 2000}    # num_samples
 ]
 
+# Multi-objective: rank parents by Pareto front (NSGA-II, requires pygad >= 3.2)
 ga_instance = pygad.GA(
     num_generations=100,
     num_parents_mating=5,
@@ -117,7 +187,7 @@ ga_instance = pygad.GA(
     sol_per_pop=50,
     num_genes=4,
     gene_space=gene_space,
-    parent_selection_type="rank",
+    parent_selection_type="nsga2",
     crossover_type="single_point",
     mutation_type="random",
     mutation_percent_genes=40
@@ -127,16 +197,33 @@ ga_instance = pygad.GA(
 ga_instance.run()
 
 # ----------------- Results -----------------
-solution, solution_fitness, solution_idx = ga_instance.best_solution()
-print(f"Best Solution: {solution}")
-print(f"Fitness of Best Solution: {solution_fitness}")
+# Accuracy/cost Pareto front over every configuration evaluated during the run
+front = pareto_front(evaluated)
+cost_unit = "s" if cost_mode == "measured" else "XOR ops"
+print(f"Pareto front ({len(front)} configurations, cheapest first):")
+for key in front:
+    total_error, max_error, cost = evaluated[key]
+    print(f"  cost: {cost:.6g} {cost_unit}, max error: {max_error:.2f} Hz, total squared error: {total_error:.2f}, "
+          f"params: {key}")
+
+# Choose the cheapest configuration that meets the accuracy target, not the most accurate one
+meeting_target = [key for key in front if evaluated[key][1] <= max_allowed_error]
+if meeting_target:
+    solution = meeting_target[0]
+    print(f"Cheapest configuration within +/- {max_allowed_error} Hz:")
+else:
+    solution = min(front, key=lambda k: evaluated[k][1])
+    print(f"No configuration within +/- {max_allowed_error} Hz, using the most accurate one:")
 
 best_low_thresh, best_high_thresh, best_samples_to_skip, best_num_samples = solution
+total_error, max_error, cost = evaluated[solution]
 print(f"Best Params:")
 print(f"  Low Threshold: {best_low_thresh}")
 print(f"  High Threshold: {best_high_thresh}")
 print(f"  Samples to Skip: {int(best_samples_to_skip)}")
 print(f"  Number of Samples: {int(best_num_samples)}")
+print(f"  Max Error: {max_error:.2f} Hz")
+print(f"  Cost: {cost:.6g} {cost_unit}")
 
 print(f"Default Params:")
 print(f"  Low Threshold: {-0.1}")
@@ -148,7 +235,7 @@ print(f"  Number of Samples: {1000}")
 untuned_estimates = []
 tuned_estimates = []
 
-for file_path, true_freq in test_files:
+for file_path, true_freq, _, _ in test_files:
     # Untuned (default parameters)
     untuned_freq = estimate_freq_via_xor_trigger(
         file_path
@@ -176,4 +263,20 @@ plt.ylabel('Frequency (Hz)')
 plt.title('True vs Untuned vs Tuned Frequency Estimates')
 plt.legend()
 plt.grid()
+
+# --- Plot Pareto front ---
+plt.figure(figsize=(8, 6))
+all_costs = [cost for _, _, cost in evaluated.values()]
+all_errors = [max_error for _, max_error, _ in evaluated.values()]
+plt.scatter(all_costs, all_errors, s=8, alpha=0.3, label='Evaluated configurations')
+plt.plot([evaluated[k][2] for k in front], [evaluated[k][1] for k in front], marker='o', color='red',
+         label='Pareto front')
+plt.scatter([cost], [max_error], marker='*', s=200, color='green', label='Chosen configuration', zorder=3)
+plt.axhline(max_allowed_error, linestyle='--', color='gray', label=f'+/- {max_allowed_error} Hz')
+plt.xlabel(f'Cost ({cost_unit})')
+plt.ylabel('Max Error (Hz)')
+plt.yscale('symlog')
+plt.title('Accuracy / Cost Pareto Front')
+plt.legend()
+plt.grid()
 plt.show()
@@ -4,6 +4,7 @@ import os
 import pandas as pd
 from pydub import AudioSegment
 import math
+import time
 
 # Folder containing the input .wav files
 folder_path = "plucks"
@@ -35,16 +36,10 @@ def zero_crossings_in_array_filtered(arr):
     return zero_crossings
 
 
-def estimate_freq_via_xor_trigger(file_path, num_samples=1000):
-    # ==============================================================================
-    #  Copyright (c) 2014-2018 Joel de Guzman. All rights reserved.
-    #
-    #  Distributed under the Boost Software License, Version 1.0. (See accompanying
-    #  file LICENSE_1_0.txt or copy at http://www.boost.org/LICENSE_1_0.txt)
-    # ==============================================================================
+def load_wav_samples(file_path, num_samples=None):
     """
-    Estimates frequency using a binary trigger and XOR autocorrelation on the first few samples.
-    Returns estimated frequency in Hz.
+    Loads a .wav file, keeps only the first channel and normalizes it to [-1, 1].
+    Returns (audio, framerate).
     """
     with wave.open(file_path, 'rb') as wf:
         n_channels = wf.getnchannels()
@@ -59,109 +54,575 @@ def estimate_freq_via_xor_trigger(file_path, num_samples=1000):
     if n_channels > 1:
         raw_audio = raw_audio[::n_channels]
 
-    raw_audio = raw_audio[:num_samples]
-    audio = raw_audio / np.max(np.abs(raw_audio))
+    if num_samples is not None:
+        raw_audio = raw_audio[:num_samples]
+    peak = np.max(np.abs(raw_audio)) if len(raw_audio) else 0
+    audio = raw_audio / peak if peak > 0 else raw_audio.astype(np.float64)
+
+    return audio, framerate
 
-    # Binary trigger
-    class zero_cross:
-        def __init__(self):
-            self.y = 0
 
-        def __call__(self, s):
-            if s < -0.1:
-                self.y = 0
-            elif s > 0.1:
-                self.y = 1
-            return self.y
+def schmitt_trigger(audio, low_thresh=-0.1, high_thresh=0.1):
+    """
+    Vectorized binary trigger with hysteresis.
+    Goes low below low_thresh, high above high_thresh and otherwise holds the previous state (starts low).
+    """
+    audio = np.asarray(audio)
+    state = np.full(len(audio), -1, dtype=np.int8)
+    state[audio < low_thresh] = 0
+    state[audio > high_thresh] = 1
 
-    zc = zero_cross()
-    trig = [zc(s) for s in audio]
+    # Forward-fill the "hold" samples with the index of the last decided sample
+    decided = np.where(state >= 0, np.arange(len(audio)), -1)
+    last_decided = np.maximum.accumulate(decided) if len(audio) else decided
+    trig = np.where(last_decided >= 0, state[np.maximum(last_decided, 0)], 0)
 
-    # XOR autocorrelation
-    def count_ones(l):
-        return sum(1 for e in l if e)
+    return trig.astype(np.uint8)
+
+
+# Number of set bits of every byte value, for numpy versions without np.bitwise_count (< 2.0)
+popcount_table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount_bytes(values):
+    """Number of set bits of every byte of a uint8 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return popcount_table[values]
+
+
+def xor_autocorrelation_popcount(trig, lags=None):
+    # ==============================================================================
+    #  Copyright (c) 2014-2018 Joel de Guzman. All rights reserved.
+    #
+    #  Distributed under the Boost Software License, Version 1.0. (See accompanying
+    #  file LICENSE_1_0.txt or copy at http://www.boost.org/LICENSE_1_0.txt)
+    # ==============================================================================
+    """
+    Vectorized XOR autocorrelation: for every lag, counts the set bits of trig[0:leng] XOR trig[lag:lag + leng].
+    Only the requested lags are computed (default: 0 .. leng - 1), so the cost is O(leng * len(lags)).
+    Returns (results_autocorr, leng) with one mismatch count per requested lag.
+    """
+    trig = np.asarray(trig, dtype=np.uint8)
+    leng = math.floor(len(trig) / 2)
+    lags = np.arange(leng) if lags is None else np.asarray(lags, dtype=np.int64)
+    lags = lags[(lags >= 0) & (lags <= len(trig) - leng)]
 
-    results_autocorr = []
+    windows = np.lib.stride_tricks.sliding_window_view(trig, leng) if leng > 0 else np.empty((0, 0), np.uint8)
+    reference = np.packbits(trig[:leng])
+    results_autocorr = np.empty(len(lags), dtype=np.int64)
+
+    # Process the lags in blocks to keep the temporary bit matrix around 1M elements;
+    # each window is packed 8 bits per byte, so the XOR and the popcount run on bytes
+    block = max(1, 2 ** 20 // max(leng, 1))
+    for start in range(0, len(lags), block):
+        packed = np.packbits(windows[lags[start:start + block]], axis=1)
+        results_autocorr[start:start + block] = popcount_bytes(packed ^ reference).sum(axis=1, dtype=np.int64)
+
+    return results_autocorr, leng
+
+
+def xor_autocorrelation_fft(trig, max_lag=None):
+    """
+    FFT-based XOR autocorrelation on the binary trigger, O(N log N) regardless of the lag range.
+    Uses popcount(a XOR b) = sum(a) + sum(b) - 2 * sum(a * b), where the cross term is computed with an FFT.
+    Returns (results_autocorr, leng) for lags 0 .. max_lag - 1 (default: leng), identical to the popcount backend.
+    """
+    trig = np.asarray(trig, dtype=np.float64)
     leng = math.floor(len(trig) / 2)
-    for i in range(leng):
-        x = [a ^ b for a, b in zip(trig[0:leng], trig[i:i + leng])]
-        results_autocorr.append(count_ones(x))
-    results_autocorr.extend(results_autocorr)
+    max_lag = leng if max_lag is None else min(max_lag, len(trig) - leng + 1)
+    if leng == 0 or max_lag <= 0:
+        return np.zeros(0, dtype=np.int64), leng
+
+    reference = trig[:leng]
+    n_fft = 1 << int(len(trig) + leng - 1).bit_length()
+    cross = np.fft.irfft(np.fft.rfft(trig, n_fft) * np.conj(np.fft.rfft(reference, n_fft)), n_fft)[:max_lag]
+
+    # Number of ones in trig[lag:lag + leng] for every lag
+    cumulative = np.concatenate(([0.0], np.cumsum(trig)))
+    window_ones = cumulative[leng:leng + max_lag] - cumulative[:max_lag]
+
+    results_autocorr = np.rint(np.sum(reference) + window_ones - 2 * cross).astype(np.int64)
 
-    # Find the first notch (minimum) in correlation after skipping initial overlap
-    skip = 20
+    return results_autocorr, leng
+
+
+# Cost model of the autocorrelation backends, measured on this host by calibrate_autocorr_backends()
+autocorr_cost_model = None
+
+
+def calibrate_autocorr_backends(sizes=(256, 1024, 2048, 4096, 8192), lag_counts=(16, 128, 512, None), repeats=5):
+    """
+    Times both backends on random bitstreams over a grid of window sizes and lag counts (None: all leng lags)
+    and fits a simple cost model:
+    popcount ~ a + b * n_lags + c * leng * n_lags, fft ~ d + e * n_fft * log2(n_fft) (all lags at once).
+    The result is stored in autocorr_cost_model and used for backend="auto".
+    """
+    global autocorr_cost_model
+
+    def best_time(function, *args):
+        best = float("inf")
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            function(*args)
+            best = min(best, time.perf_counter() - start_time)
+        return best
+
+    rng = np.random.default_rng(0)
+    pop_features, pop_times, fft_features, fft_times = [], [], [], []
+    for size in sizes:
+        trig = rng.integers(0, 2, size, dtype=np.uint8)
+        leng = size // 2
+        n_fft = 1 << int(size + leng - 1).bit_length()
+        fft_features.append((1.0, n_fft * math.log2(n_fft)))
+        fft_times.append(best_time(xor_autocorrelation_fft, trig))
+
+        for n_lags in sorted({min(leng, n) if n is not None else leng for n in lag_counts}):
+            lags = np.arange(leng - n_lags, leng)  # Same cost wherever the band sits
+            pop_features.append((1.0, n_lags, leng * n_lags))
+            pop_times.append(best_time(xor_autocorrelation_popcount, trig, lags))
+
+    # Least squares on the relative error so the small windows weigh as much as the big ones
+    def fit(features, times):
+        features, times = np.asarray(features, dtype=np.float64), np.asarray(times)
+        coefficients, *_ = np.linalg.lstsq(features / times[:, None], np.ones_like(times), rcond=None)
+        return tuple(float(max(c, 0.0)) for c in coefficients)
+
+    autocorr_cost_model = {
+        "popcount": fit(pop_features, pop_times),
+        "fft": fit(fft_features, fft_times),
+    }
+    return autocorr_cost_model
+
+
+def select_autocorr_backend(num_samples, n_lags=None):
+    """
+    Picks "popcount" or "fft" from the window size and the number of lags, using the host cost model
+    (calibrated on first use).
+    """
+    if autocorr_cost_model is None:
+        calibrate_autocorr_backends()
+
+    leng = num_samples // 2
+    n_lags = leng if n_lags is None else n_lags
+    n_fft = 1 << int(num_samples + leng - 1).bit_length()
+
+    pop_offset, pop_per_lag, pop_per_bit = autocorr_cost_model["popcount"]
+    fft_offset, fft_slope = autocorr_cost_model["fft"]
+    popcount_cost = pop_offset + pop_per_lag * n_lags + pop_per_bit * leng * n_lags
+    fft_cost = fft_offset + fft_slope * n_fft * math.log2(max(n_fft, 2))
+
+    return "popcount" if popcount_cost <= fft_cost else "fft"
+
+
+def autocorrelate(trig, backend="auto", max_lag=None, cross_check=False, lags=None):
+    """
+    XOR autocorrelation of a binary trigger behind a single interface.
+    backend is "popcount", "fft" or "auto" (chosen from window size and number of lags, see select_autocorr_backend).
+    The lags are either lags 0 .. max_lag - 1 (default: leng) or an explicit lags array
+    (e.g. a narrow band around a known period), each in 0 .. len(trig) - leng.
+    With cross_check set, both backends are run and a ValueError is raised if they disagree.
+    Returns (results_autocorr, leng) with one mismatch count per lag.
+    """
+    leng = math.floor(len(trig) / 2)
+    if lags is None:
+        lags = np.arange(leng if max_lag is None else max_lag)
+    else:
+        lags = np.asarray(lags, dtype=np.int64)
+        if len(lags) and (lags.min() < 0 or lags.max() > len(trig) - leng):
+            raise ValueError(f"Lags must be within 0 .. {len(trig) - leng}")
+
+    def run(backend):
+        if backend == "popcount":
+            return xor_autocorrelation_popcount(trig, lags)[0]
+        if backend == "fft":
+            results_autocorr, _ = xor_autocorrelation_fft(trig, int(lags.max()) + 1 if len(lags) else 0)
+            return results_autocorr[lags]
+        raise ValueError(f"Unknown autocorrelation backend: {backend}")
+
+    if backend == "auto":
+        backend = select_autocorr_backend(len(trig), len(lags))
+    results_autocorr = run(backend)
+
+    if cross_check:
+        reference, other = run("popcount"), run("fft")
+        if not np.array_equal(reference, other):
+            raise ValueError(f"Autocorrelation backends disagree (max difference: "
+                             f"{np.max(np.abs(reference - other))})")
+
+    return results_autocorr, leng
+
+
+def find_autocorr_notch(results_autocorr, leng, framerate, skip=20):
+    """
+    Finds the first notch (minimum) in correlation after skipping initial overlap.
+    Returns (estimated frequency in Hz, confidence in [0, 1]).
+
+    The confidence is the notch depth relative to the mean of the searched range:
+    1.0 means a perfect match at the notch, 0.0 means the notch is no deeper than average.
+    """
     search_range = results_autocorr[skip:leng]
-    if not search_range:
-        return 0.0
+    if len(search_range) == 0:
+        return 0.0, 0.0
     notch_index_relative = np.argmin(search_range)
     notch_index = notch_index_relative + skip
 
     estimated_period = notch_index / framerate
     estimated_frequency = 1 / estimated_period if estimated_period > 0 else 0
 
+    mean_mismatch = np.mean(search_range)
+    if notch_index_relative == 0:
+        confidence = 0.0  # Correlation only rises after the skip, no real notch was found
+    elif mean_mismatch > 0:
+        confidence = 1.0 - search_range[notch_index_relative] / mean_mismatch
+    else:
+        confidence = 0.0  # Flat trigger (silence), nothing to correlate
+
+    return estimated_frequency, float(min(max(confidence, 0.0), 1.0))
+
+
+def estimate_freq_via_xor_trigger(file_path, num_samples=1000, return_confidence=False, backend="auto"):
+    """
+    Estimates frequency using a binary trigger and XOR autocorrelation on the first few samples.
+    backend selects the autocorrelation implementation ("auto", "popcount" or "fft").
+    Returns estimated frequency in Hz, or (frequency, confidence) if return_confidence is set.
+    """
+    audio, framerate = load_wav_samples(file_path, num_samples)
+
+    # Binary trigger
+    trig = schmitt_trigger(audio, -0.1, 0.1)
+
+    # XOR autocorrelation
+    results_autocorr, leng = autocorrelate(trig, backend)
+
+    estimated_frequency, confidence = find_autocorr_notch(results_autocorr, leng, framerate, skip=20)
+
+    if return_confidence:
+        return estimated_frequency, confidence
     return estimated_frequency
 
 
+def zero_crossing_periods(trig):
+    """
+    Vectorized zero-crossing detector on the binary trigger.
+    Returns the distances (in samples) between consecutive rising edges, i.e. one value per period on a clean note.
+    """
+    rising_edges = np.flatnonzero(np.diff(np.asarray(trig).astype(np.int8)) == 1)
+    return np.diff(rising_edges)
+
+
+def estimate_freq_via_zero_crossings(trig, framerate, min_periods=2):
+    """
+    Cheap vectorized zero-crossing estimate on the binary trigger of a single frame.
+    Uses the spread of the edge-to-edge intervals as confidence, and also reports the drift between
+    the periods in the first and second half of the frame (relative to the mean period).
+    Needs at least min_periods full periods, i.e. min_periods + 1 rising edges in the frame.
+    Returns (estimated frequency in Hz, confidence in [0, 1], drift).
+    """
+    periods = zero_crossing_periods(trig)
+    if len(periods) < max(min_periods, 2):
+        return 0.0, 0.0, float("inf")
+
+    mean_period = np.mean(periods)
+    estimated_frequency = framerate / mean_period
+
+    # Stable notes have (almost) identical periods; extra crossings from harmonics or noise do not
+    confidence = 1.0 - np.std(periods) / mean_period
+
+    half = len(periods) // 2
+    drift = abs(np.mean(periods[:half]) - np.mean(periods[half:])) / mean_period
+
+    return float(estimated_frequency), float(min(max(confidence, 0.0), 1.0)), float(drift)
+
+
+def cascade_frame_size(framerate, lowest_freq=80.0, min_periods=2):
+    """
+    Smallest frame that always holds min_periods + 1 rising edges of a note at lowest_freq,
+    i.e. min_periods + 1 periods since the first edge can fall anywhere in the first period.
+    Shorter frames always escalate to the XOR autocorrelation for notes at that pitch.
+    """
+    return int(math.ceil((min_periods + 1) * framerate / lowest_freq))
+
+
+def estimate_freq_cascade(audio, framerate, min_confidence=0.98, max_deviation=0.02, skip=20, backend="auto",
+                          min_periods=2):
+    """
+    Confidence-gated cascade on a single frame.
+    Runs the cheap zero-crossing estimate first and only escalates to the XOR autocorrelation
+    when that estimate is low confidence or unstable (the periods in the first and second half
+    of the frame differ by more than max_deviation).
+    The zero-crossing path needs min_periods + 1 rising edges, so the frame should be at least
+    cascade_frame_size(framerate, lowest expected pitch) samples long.
+    Returns (estimated frequency in Hz, confidence, method), method being "zc" or "xor";
+    the frequency is 0.0 when no notch is found.
+    """
+    trig = schmitt_trigger(audio, -0.1, 0.1)
+
+    freq_zc, confidence_zc, drift = estimate_freq_via_zero_crossings(trig, framerate, min_periods)
+    if freq_zc > 0 and confidence_zc >= min_confidence and drift <= max_deviation:
+        return freq_zc, confidence_zc, "zc"
+
+    results_autocorr, leng = autocorrelate(trig, backend)
+    freq_xor, confidence_xor = find_autocorr_notch(results_autocorr, leng, framerate, skip=skip)
+    if confidence_xor == 0:
+        freq_xor = 0.0  # No notch (e.g. silence), do not report framerate / skip
+
+    return float(freq_xor), confidence_xor, "xor"
+
+
+class PitchTracker:
+    """
+    Stateful frame-by-frame pitch tracker.
+    Keeps the last estimated period and only searches a narrow lag band around it (plus the octave
+    above and below and a third of it), falling back to a full search on an onset, when the note moves
+    to one of the other bands, or when the confidence drops.
+    A confidence drop only triggers a full search after retry_interval frames in a row without a note;
+    meanwhile the narrow search keeps trying around the last period.
+
+    Usage:
+        tracker = PitchTracker(framerate)
+        for frame in frames:
+            freq, confidence = tracker(frame)
+    """
+
+    def __init__(self, framerate, skip=20, band=0.03, min_confidence=0.6, onset_ratio=2.0, octave_margin=0.1,
+                 retry_interval=4, low_thresh=-0.1, high_thresh=0.1, backend="auto"):
+        self.framerate = framerate
+        self.skip = skip  # Smallest lag considered (same meaning as in estimate_freq_via_xor_trigger)
+        self.band = band  # Half-width of the lag band around the previous period, relative to that period
+        self.min_confidence = min_confidence  # Below this, the frame is treated as having no note
+        self.onset_ratio = onset_ratio  # RMS jump between frames that is treated as a new note
+        self.octave_margin = octave_margin  # Notches closer than this (relative depth) count as equally deep
+        self.retry_interval = retry_interval  # Frames between full searches while no note is found
+        self.low_thresh = low_thresh
+        self.high_thresh = high_thresh
+        self.backend = backend
+        self.reset()
+
+    def reset(self):
+        """Forgets the tracked note and clears the work counters."""
+        self.forget_note()
+        self.frames_tracked = 0  # Frames that went through the tracker (silent frames skipped by the caller are not)
+        self.full_searches = 0
+        self.narrow_searches = 0
+        self.lags_searched = 0  # Lags requested; the FFT backend computes all lags of a full search at once
+        self.search_time = 0.0  # Seconds spent in the autocorrelation (the actual work, whatever the backend)
+
+    def forget_note(self):
+        """Forgets the tracked note (e.g. after silence), the next frame gets a full search. Keeps the work counters."""
+        self.period = None
+        self.previous_rms = 0.0
+        self.misses = 0  # Frames in a row without a note
+
+    def __call__(self, audio):
+        """
+        Estimates the frequency of one frame.
+        Returns (estimated frequency in Hz, confidence in [0, 1]), (0.0, 0.0) when no note is found.
+        """
+        self.frames_tracked += 1
+        audio = np.asarray(audio, dtype=np.float64)
+        rms = float(np.sqrt(np.mean(audio ** 2))) if len(audio) else 0.0
+        onset = rms > self.onset_ratio * self.previous_rms
+        self.previous_rms = rms
+
+        peak = np.max(np.abs(audio)) if len(audio) else 0
+        if peak == 0:
+            self.period = None
+            return 0.0, 0.0
+        trig = schmitt_trigger(audio / peak, self.low_thresh, self.high_thresh)
+
+        if self.period is not None and not onset:
+            period, confidence = self.narrow_search(trig)
+            if confidence >= self.min_confidence:
+                self.period = period
+                self.misses = 0
+                return self.framerate / period, confidence
+
+        # Without an onset, a confidence drop only gets a full search after retry_interval frames in a row
+        # (a single bad frame is usually a transient), and so does a tracker that has not found any note yet
+        first_search = self.period is None and self.misses == 0
+        self.misses += 1
+        if not onset and not first_search and self.misses % self.retry_interval:
+            return 0.0, 0.0
+
+        period, confidence = self.full_search(trig)
+        if period <= self.skip or confidence < self.min_confidence:
+            return 0.0, 0.0  # The previous period (if any) is kept as a hint for the narrow search
+        self.period = period
+        self.misses = 0
+        return self.framerate / period, confidence
+
+    def notch_confidence(self, trig, mismatch):
+        """
+        Notch depth relative to the expected mismatch between unrelated bitstreams with the same
+        density of ones (the mean of a full autocorrelation), so both searches share one reference.
+        """
+        leng = len(trig) // 2
+        ones = np.mean(trig[:leng]) if leng else 0.0
+        expected_mismatch = 2 * ones * (1 - ones) * leng
+        if expected_mismatch <= 0:
+            return 0.0, expected_mismatch
+        confidence = 1.0 - mismatch / expected_mismatch
+        return float(min(max(confidence, 0.0), 1.0)), expected_mismatch
+
+    def full_search(self, trig):
+        """
+        Searches every lag from skip to leng for the first notch within octave_margin of the deepest one.
+        Returns (period in samples, confidence), (0, 0.0) when no notch is found.
+        """
+        start_time = time.perf_counter()
+        results_autocorr, leng = autocorrelate(trig, self.backend)
+        self.search_time += time.perf_counter() - start_time
+        self.full_searches += 1
+        self.lags_searched += leng
+        results_autocorr = np.asarray(results_autocorr[:leng])
+        if leng <= self.skip:
+            return 0, 0.0
+
+        # Leave the lobe around lag 0 first: before the correlation rises again, there is no notch
+        _, expected_mismatch = self.notch_confidence(trig, 0)
+        rising = np.flatnonzero(results_autocorr[self.skip:] > 0.5 * expected_mismatch)
+        if expected_mismatch <= 0 or len(rising) == 0:
+            return 0, 0.0
+        start = self.skip + rising[0]
+
+        deepest = np.min(results_autocorr[start:])
+        threshold = deepest + self.octave_margin * expected_mismatch
+        period = start + int(np.flatnonzero(results_autocorr[start:] <= threshold)[0])
+        while period + 1 < leng and results_autocorr[period + 1] < results_autocorr[period]:
+            period += 1  # Bottom of that notch
+        if period == leng - 1:
+            return 0, 0.0  # Still falling at the last lag, the notch is outside the frame
+
+        confidence, _ = self.notch_confidence(trig, results_autocorr[period])
+        return period, confidence
+
+    def narrow_search(self, trig):
+        """
+        Searches a band around the previous period, around its octaves and around a third of it.
+        When the note has moved to one of those bands (e.g. a legato change where 2P or P is now a multiple
+        of the new period), the result is confirmed with a full search, which finds the first notch.
+        Returns (period in samples, confidence).
+        """
+        leng = len(trig) // 2
+
+        candidates = []
+        for center in (self.period, self.period * 2, self.period // 2, self.period // 3):
+            half_width = max(2, int(math.ceil(self.band * center)))
+            low = max(self.skip, center - half_width)
+            high = min(leng, center + half_width + 1)
+            if low < high:
+                candidates.append((center, np.arange(low, high)))
+        if not candidates:
+            return 0, 0.0
+
+        lags = np.concatenate([band_lags for _, band_lags in candidates])
+        start_time = time.perf_counter()
+        results_autocorr, _ = autocorrelate(trig, self.backend, lags=lags)
+        self.search_time += time.perf_counter() - start_time
+        self.narrow_searches += 1
+        self.lags_searched += len(lags)
+
+        # Best lag of each band
+        best = []
+        offset = 0
+        for center, band_lags in candidates:
+            band_results = results_autocorr[offset:offset + len(band_lags)]
+            index = int(np.argmin(band_results))
+            best.append((int(band_lags[index]), int(band_results[index]), center))
+            offset += len(band_lags)
+
+        # Drop band minima sitting on the last lag, the notch is outside the frame
+        best = [(p, m, center) for p, m, center in best if p < leng - 1]
+        if not best:
+            return 0, 0.0
+
+        # A multiple of the period notches as deep as the period itself, so among the bands
+        # within octave_margin of the deepest one, the shortest period wins (like the first notch)
+        deepest = min(mismatch for _, mismatch, _ in best)
+        _, expected_mismatch = self.notch_confidence(trig, deepest)
+        period, mismatch, center = min(b for b in best if b[1] <= deepest + self.octave_margin * expected_mismatch)
+
+        if center != self.period:
+            # The note changed: the winning band may itself be a multiple of the new period
+            return self.full_search(trig)
+
+        confidence, _ = self.notch_confidence(trig, mismatch)
+        return period, confidence
+
+
 # --- Main processing loop over all WAV files in the folder ---
-for filename in os.listdir(folder_path):
-    if "converted" in filename and filename.endswith(".wav"):
-        input_path = os.path.join(folder_path, filename)
-        filtered_path = "temp_filtered.wav"  # Temporary file for low-pass filtered audio
-
-        # Extract true frequency from filename, e.g. "pluck_cropped_98Hz_converted.wav"
-        try:
-            freq_part = filename.split("_")[2]
-            true_freq = float(freq_part.replace("Hz", ""))
-        except:
-            true_freq = None
-
-        # --- Load original (unfiltered) audio ---
-        with wave.open(input_path, "r") as song_wav:
-            raw_bytes = song_wav.readframes(-1)
-            sample_rate = song_wav.getframerate()
-            duration = song_wav.getnframes() / sample_rate
-
-        # Convert audio bytes to numpy array and normalize
-        raw = np.frombuffer(raw_bytes, dtype=np.int16)
-        raw = raw / np.max(np.abs(raw))  # Normalize to [-1, 1]
-
-        # Estimate frequency using zero-crossing count
-        zc_raw = len(zero_crossings_in_array(raw))
-        freq_zc = (zc_raw / duration) / 2  # Divide by 2 because each full wave has two crossings
-
-        # --- Apply low-pass filter using PyDub (cutoff = 500Hz) ---
-        song = AudioSegment.from_wav(input_path)
-        filtered = song.low_pass_filter(500)  # Simple LPF
-        filtered.export(filtered_path, format="wav")  # Export to temporary file
-
-        # Load filtered audio
-        with wave.open(filtered_path, "r") as song_wav:
-            raw_bytes_filt = song_wav.readframes(-1)
-            sample_rate_filt = song_wav.getframerate()
-            duration_filt = song_wav.getnframes() / sample_rate_filt
-
-        # Convert filtered audio bytes to array and normalize
-        raw_filt = np.frombuffer(raw_bytes_filt, dtype=np.int16)
-        raw_filt = raw_filt / np.max(np.abs(raw_filt))
-
-        # Estimate frequency again using zero-crossings on filtered audio
-        zc_filt = len(zero_crossings_in_array(raw_filt))
-        freq_zc_filt = (zc_filt / duration_filt) / 2
-
-        # Estimate frequency using XOR autocorrelation method
-        freq_xor = estimate_freq_via_xor_trigger(input_path)
-
-        # Save results for this file
-        results.append({
-            "Filename": filename,
-            "Frequency (Hz)": true_freq,
-            "Frequency (estimated by ZC) (Hz)": round(freq_zc, 2),
-            "Frequency (estimated by ZC + LPF 500Hz) (Hz)": round(freq_zc_filt, 2),
-            "Frequency (estimated by XOR autocorr) (Hz)": round(freq_xor, 2),
-            "Audio duration (s)": round(duration, 4)
-        })
-
-# --- Export all results to Excel ---
-df = pd.DataFrame(results)
-df.to_excel("tables\\zero_crossings_auto_generated_table.xlsx", index=False)
-print("Table saved as 'zero_crossings_auto_generated_table.xlsx'")
+if __name__ == "__main__":
+    for filename in os.listdir(folder_path):
+        if "converted" in filename and filename.endswith(".wav"):
+            input_path = os.path.join(folder_path, filename)
+            filtered_path = "temp_filtered.wav"  # Temporary file for low-pass filtered audio
+
+            # Extract true frequency from filename, e.g. "pluck_cropped_98Hz_converted.wav"
+            try:
+                freq_part = filename.split("_")[2]
+                true_freq = float(freq_part.replace("Hz", ""))
+            except:
+                true_freq = None
+
+            # --- Load original (unfiltered) audio ---
+            with wave.open(input_path, "r") as song_wav:
+                raw_bytes = song_wav.readframes(-1)
+                sample_rate = song_wav.getframerate()
+                duration = song_wav.getnframes() / sample_rate
+
+            # Convert audio bytes to numpy array and normalize
+            raw = np.frombuffer(raw_bytes, dtype=np.int16)
+            raw = raw / np.max(np.abs(raw))  # Normalize to [-1, 1]
+
+            # Estimate frequency using zero-crossing count
+            zc_raw = len(zero_crossings_in_array(raw))
+            freq_zc = (zc_raw / duration) / 2  # Divide by 2 because each full wave has two crossings
+
+            # --- Apply low-pass filter using PyDub (cutoff = 500Hz) ---
+            song = AudioSegment.from_wav(input_path)
+            filtered = song.low_pass_filter(500)  # Simple LPF
+            filtered.export(filtered_path, format="wav")  # Export to temporary file
+
+            # Load filtered audio
+            with wave.open(filtered_path, "r") as song_wav:
+                raw_bytes_filt = song_wav.readframes(-1)
+                sample_rate_filt = song_wav.getframerate()
+                duration_filt = song_wav.getnframes() / sample_rate_filt
+
+            # Convert filtered audio bytes to array and normalize
+            raw_filt = np.frombuffer(raw_bytes_filt, dtype=np.int16)
+            raw_filt = raw_filt / np.max(np.abs(raw_filt))
+
+            # Estimate frequency again using zero-crossings on filtered audio
+            zc_filt = len(zero_crossings_in_array(raw_filt))
+            freq_zc_filt = (zc_filt / duration_filt) / 2
+
+            # Estimate frequency using XOR autocorrelation method
+            freq_xor, confidence_xor = estimate_freq_via_xor_trigger(input_path, return_confidence=True)
+
+            # Estimate frequency using the cascade (ZC first, XOR only when needed)
+            # The frame is sized so a note at the lowest expected pitch (80 Hz) can stay on the ZC path
+            with wave.open(input_path, "r") as song_wav:
+                cascade_num_samples = cascade_frame_size(song_wav.getframerate(), lowest_freq=80.0)
+            audio_frame, framerate = load_wav_samples(input_path, cascade_num_samples)
+            freq_cascade, confidence_cascade, cascade_method = estimate_freq_cascade(audio_frame, framerate)
+
+            # Save results for this file
+            results.append({
+                "Filename": filename,
+                "Frequency (Hz)": true_freq,
+                "Frequency (estimated by ZC) (Hz)": round(freq_zc, 2),
+                "Frequency (estimated by ZC + LPF 500Hz) (Hz)": round(freq_zc_filt, 2),
+                "Frequency (estimated by XOR autocorr) (Hz)": round(freq_xor, 2),
+                "XOR autocorr confidence": round(confidence_xor, 3),
+                "Frequency (estimated by cascade) (Hz)": round(freq_cascade, 2),
+                "Cascade confidence": round(confidence_cascade, 3),
+                "Cascade method": cascade_method,
+                "Audio duration (s)": round(duration, 4)
+            })
+
+    # --- Export all results to Excel ---
+    df = pd.DataFrame(results)
+    df.to_excel("tables\\zero_crossings_auto_generated_table.xlsx", index=False)
+    print("Table saved as 'zero_crossings_auto_generated_table.xlsx'")
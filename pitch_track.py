@@ -0,0 +1,167 @@
+import sys
+import struct
+import time
+import numpy as np
+from frequency_estimator import PitchTracker, calibrate_autocorr_backends
+
+# Long recording to analyse (can be overridden from the command line)
+file_path = "plucks_raw/pluck_82.4Hz.wav"
+
+# One row per analysed frame
+pitch_track_dtype = np.dtype([("time", np.float64), ("frequency", np.float32), ("confidence", np.float32)])
+
+
+def read_wav_header(f):
+    """
+    Parses the RIFF header of an open .wav file and leaves the file positioned at the start of the audio data.
+    Unlike the wave module, also accepts WAVE_FORMAT_EXTENSIBLE files (e.g. 24 bit recordings).
+    Returns (n_channels, sampwidth, framerate, n_frames).
+    """
+    riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+    if riff != b"RIFF" or wave_id != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE file")
+
+    fmt = None
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            raise ValueError("No data chunk found")
+        chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+
+        if chunk_id == b"fmt ":
+            fmt = f.read(chunk_size + (chunk_size & 1))  # Chunks are padded to an even size
+            format_tag, n_channels, framerate, _, _, bits_per_sample = struct.unpack("<HHIIHH", fmt[:16])
+            if format_tag == 0xFFFE:  # WAVE_FORMAT_EXTENSIBLE, the real format is in the sub-format GUID
+                format_tag = struct.unpack("<H", fmt[24:26])[0]
+            if format_tag != 1:
+                raise ValueError(f"Only PCM .wav files are supported (format tag {format_tag})")
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            sampwidth = bits_per_sample // 8
+            return n_channels, sampwidth, framerate, chunk_size // (n_channels * sampwidth)
+        else:
+            f.seek(chunk_size + (chunk_size & 1), 1)
+
+
+def decode_pcm(raw_bytes, n_channels, sampwidth):
+    """
+    Converts raw PCM bytes to the first channel as floats in [-1, 1] (normalized to full scale).
+    """
+    if sampwidth == 1:
+        samples = np.frombuffer(raw_bytes, dtype=np.uint8)[::n_channels].astype(np.float64)
+        return (samples - 128) / 128
+    if sampwidth == 3:
+        frames = np.frombuffer(raw_bytes, dtype=np.uint8).reshape(-1, n_channels, 3)[:, 0, :].astype(np.int32)
+        samples = frames[:, 0] | (frames[:, 1] << 8) | (frames[:, 2] << 16)
+        samples = np.where(samples >= 1 << 23, samples - (1 << 24), samples)  # Sign extension
+        return samples / float(1 << 23)
+
+    dtype = {2: np.int16, 4: np.int32}[sampwidth]
+    samples = np.frombuffer(raw_bytes, dtype=dtype)[::n_channels]
+    return samples / float(np.iinfo(dtype).max + 1)
+
+
+def read_wav_chunks(file_path, chunk_size=65536):
+    """
+    Reads a .wav file in chunks of chunk_size frames, so memory stays constant whatever the length of the file.
+    Yields (audio, framerate) with audio the first channel in [-1, 1].
+    """
+    with open(file_path, "rb") as f:
+        n_channels, sampwidth, framerate, n_frames = read_wav_header(f)
+        frame_bytes = n_channels * sampwidth
+
+        remaining = n_frames
+        while remaining > 0:
+            raw_bytes = f.read(min(chunk_size, remaining) * frame_bytes)
+            n_read = len(raw_bytes) // frame_bytes
+            if n_read == 0:
+                break
+            remaining -= n_read
+            yield decode_pcm(raw_bytes[:n_read * frame_bytes], n_channels, sampwidth), framerate
+
+
+def extract_pitch_track(file_path, frame_size=2048, hop_size=1024, chunk_size=65536, silence_rms=1e-3,
+                        output_path=None, tracker=None):
+    """
+    Pitch track of a long recording, read chunk by chunk.
+    Every frame of frame_size samples (one every hop_size samples) goes through a PitchTracker;
+    frames quieter than silence_rms (full scale) and frames without a note are reported as 0 Hz with 0 confidence.
+
+    The result is a structured array (time in s, frequency in Hz, confidence) preallocated from the
+    file header. With output_path set, it is written straight into a .npy file (memory-mapped),
+    so memory use does not depend on the length of the recording.
+    A PitchTracker can be passed in to read its work counters afterwards.
+    """
+    with open(file_path, "rb") as f:
+        _, _, framerate, n_frames = read_wav_header(f)
+
+    n_track_frames = max(0, (n_frames - frame_size) // hop_size + 1)
+    if output_path is not None:
+        track = np.lib.format.open_memmap(output_path, mode="w+", dtype=pitch_track_dtype, shape=(n_track_frames,))
+    else:
+        track = np.zeros(n_track_frames, dtype=pitch_track_dtype)
+
+    if tracker is None:
+        tracker = PitchTracker(framerate)
+    buffer = np.zeros(0)  # Samples carried over between chunks (less than one frame)
+    buffer_start = 0  # Position of buffer[0] in the recording, in samples
+    index = 0
+
+    for audio, _ in read_wav_chunks(file_path, chunk_size):
+        buffer = np.concatenate((buffer, audio))
+
+        start = index * hop_size - buffer_start
+        while start + frame_size <= len(buffer) and index < n_track_frames:
+            frame = buffer[start:start + frame_size]
+            if np.sqrt(np.mean(frame ** 2)) < silence_rms:
+                tracker.forget_note()
+                frequency, confidence = 0.0, 0.0
+            else:
+                frequency, confidence = tracker(frame)
+            if confidence == 0:
+                frequency = 0.0  # No note, so the file is usable without filtering
+
+            track[index] = (index * hop_size / framerate, frequency, confidence)
+            index += 1
+            start += hop_size
+
+        # Keep only what the next frame still needs
+        drop = min(start, len(buffer))
+        buffer = buffer[drop:]
+        buffer_start += drop
+
+    if output_path is not None:
+        track.flush()
+
+    return track
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        file_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) > 2 else None
+
+    with open(file_path, "rb") as f:
+        _, _, framerate, n_frames = read_wav_header(f)
+    duration = n_frames / framerate
+
+    tracker = PitchTracker(framerate)
+    calibrate_autocorr_backends()  # One-off host timing, kept out of the processing time
+    start_time = time.time()
+    track = extract_pitch_track(file_path, output_path=output_path, tracker=tracker)
+    elapsed = time.time() - start_time
+
+    voiced = track[track["frequency"] > 0]
+    print(f"Frames analysed: {len(track)} ({len(voiced)} voiced)")
+    tracked = max(tracker.frames_tracked, 1)
+    print(f"Frames through the tracker (not silent): {tracker.frames_tracked}")
+    print(f"Autocorrelation work: {tracker.full_searches} full and {tracker.narrow_searches} narrow searches, "
+          f"{tracker.lags_searched / tracked:.0f} lags and {tracker.search_time / tracked * 1e6:.0f} us "
+          f"per tracked frame")
+    if len(voiced):
+        print(f"Median frequency (voiced frames): {np.median(voiced['frequency']):.2f} Hz")
+    print(f"Audio duration: {duration:.2f} s, processing time: {elapsed:.2f} s "
+          f"({duration / elapsed:.1f}x real-time)")
+    if output_path is not None:
+        print(f"Pitch track saved as '{output_path}'")
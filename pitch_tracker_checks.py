@@ -0,0 +1,44 @@
+import numpy as np
+from frequency_estimator import PitchTracker
+
+# Regression checks for PitchTracker on synthetic notes, run with: python pitch_tracker_checks.py
+framerate = 44100
+frame_size = 2048
+hop_size = 1024
+
+
+def legato_track(first_freq, second_freq, n_frames=20):
+    """
+    Tracks a pure sine that changes pitch without any RMS onset (phase continuous, same amplitude).
+    Returns the estimated frequencies of the frames fully inside the second note.
+    """
+    half = (n_frames // 2) * hop_size + frame_size
+    n_samples = 2 * half
+    freqs = np.where(np.arange(n_samples) < half, first_freq, second_freq)
+    audio = np.sin(2 * np.pi * np.cumsum(freqs) / framerate)
+
+    tracker = PitchTracker(framerate)
+    estimates = []
+    for start in range(0, n_samples - frame_size + 1, hop_size):
+        frequency, _ = tracker(audio[start:start + frame_size])
+        if start >= half:
+            estimates.append(frequency)
+    return np.array(estimates)
+
+
+def check_legato(first_freq, second_freq, tolerance=2.0):
+    estimates = legato_track(first_freq, second_freq)
+    voiced = estimates[estimates > 0]
+    assert len(voiced) > 0, f"{first_freq} -> {second_freq} Hz: no note found"
+    assert np.all(np.abs(voiced - second_freq) <= tolerance), \
+        f"{first_freq} -> {second_freq} Hz: tracked {np.round(voiced, 1)}"
+    print(f"{first_freq} -> {second_freq} Hz legato: OK (median {np.median(voiced):.1f} Hz)")
+
+
+if __name__ == "__main__":
+    check_legato(100.0, 150.0)  # 2P of 100 Hz is 3 periods of 150 Hz (used to lock onto 50 Hz)
+    check_legato(110.0, 165.0)
+    check_legato(100.0, 200.0)  # Octave up
+    check_legato(200.0, 100.0)  # Octave down
+    check_legato(100.0, 300.0)  # P is 3 periods of the new note
+    check_legato(100.0, 130.0)  # Unrelated interval, recovered through the full search retries